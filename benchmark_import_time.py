@@ -0,0 +1,111 @@
+# This script measures how long the game app takes to import, which oTree does on every
+# server start (otree devserver/prodserver, and each Heroku dyno cold start).
+# Each import runs in a fresh Python process, so nothing is already cached in sys.modules.
+# oTree itself is measured too, so the app's own share is the difference between the two.
+#
+# Run it from the project folder, e.g.
+#     python benchmark_import_time.py
+#     python benchmark_import_time.py --repeats 10 --modules 15
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be imported when the game app loads
+HEAVY_MODULES = ['botex', 'litellm', 'openai', 'tiktoken']
+
+TARGETS = [
+    ('otree.api', 'import otree.api'),
+    ('game app', 'import game'),
+    ('botex', 'import botex'),
+]
+
+MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps(dict(ms=elapsed * 1000, heavy=[m for m in {heavy!r} if m in sys.modules])))
+"""
+
+
+def time_import(statement):
+    """Import time in ms in a fresh process, and the heavy modules it loaded"""
+    code = MEASURE.format(statement=statement, heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(module, count):
+    """The slowest modules imported directly by module, from python -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    modules = []
+    children = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Nesting is shown by indenting the name two spaces per level, and a module is listed
+        # after everything it imports. Nested imports are included in their parent's time.
+        indent = len(parts[2]) - len(parts[2].lstrip())
+        if indent == 3:
+            children.append((int(parts[1]) / 1000, parts[2].strip()))
+        elif indent == 1:
+            if parts[2].strip() == module:
+                modules = children
+            children = []
+    return sorted(modules, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of the game app")
+    parser.add_argument('--repeats', type=int, default=5, help="fresh processes per import")
+    parser.add_argument('--modules', type=int, default=10, help="slowest modules to list for the game app")
+    args = parser.parse_args()
+
+    print(f"{'Import':<12} {'Median ms':>10} {'Min ms':>8}  Heavy modules loaded")
+    heavy_loaded = []
+    game_failed = False
+    for name, statement in TARGETS:
+        samples = [time_import(statement) for _ in range(args.repeats)]
+        if None in samples:
+            print(f"{name:<12} {'failed':>10}  (not installed?)")
+            # botex is optional here, but the game app failing to import is what this should catch
+            if name == 'game app':
+                game_failed = True
+            continue
+        times = [s['ms'] for s in samples]
+        heavy = samples[0]['heavy']
+        print(f"{name:<12} {statistics.median(times):>10.1f} {min(times):>8.1f}  {', '.join(heavy) or '-'}")
+        if name == 'game app':
+            heavy_loaded = heavy
+
+    if game_failed:
+        print("\nThe game app failed to import - run python -c 'import game' from the project folder to see why")
+        return 1
+
+    print("\nSlowest imports made by the game app:")
+    for ms, module in slowest_modules('game', args.modules):
+        print(f"  {ms:>8.1f} ms  {module}")
+
+    if heavy_loaded:
+        print(f"\nThe game app imports {', '.join(heavy_loaded)} - these should only be imported when used")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# Timing recorder for botex experiments (used by run_botex_experiment.py)
+# Records how long each step of a run takes (server startup, session init, bots, export),
+# the latency of every LLM call the bots make, each bot's time to first page and the
+# time bots spend per round, and reports them with a percentile breakdown.
+
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+PERCENTILES = (50, 90, 95, 99)
+
+# The Game page title tells us which round a bot is looking at
+ROUND_PATTERN = re.compile(r"Round (\d+) of (\d+)")
+
+
+def percentile(sorted_values, pct):
+    """Linear interpolation between the closest ranks of an already sorted list"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def describe(values):
+    """Count, total, mean, min, percentiles and max of a list of durations"""
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    stats = {
+        'count': len(values),
+        'total': sum(values),
+        'mean': sum(values) / len(values),
+        'min': values[0],
+    }
+    for pct in PERCENTILES:
+        stats[f'p{pct}'] = percentile(values, pct)
+    stats['max'] = values[-1]
+    return stats
+
+
+def parse_utc(timestamp):
+    """Parse a timestamp from botex or an oTree export, treating naive times as UTC"""
+    if not timestamp:
+        return None
+    parsed = datetime.fromisoformat(str(timestamp))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class TimingRecorder:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = {}  # Step name -> seconds, in the order the steps ran
+        self.samples = {}  # Metric name -> list of seconds
+        self.page_calls = {}  # Bot thread name -> list of (start, end, round number or None)
+        self.per_bot = {}  # Participant code -> timings for that bot
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        """Time a block of the run, e.g. `with timing.step('export'): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start
+
+    def add_sample(self, metric, seconds):
+        with self.lock:
+            self.samples.setdefault(metric, []).append(seconds)
+
+    def wrap_completion(self, completion):
+        """Wrap botex's completion function so that every LLM call is timed"""
+        def timed_completion(**kwargs):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = completion(**kwargs)
+                return response
+            finally:
+                end = time.perf_counter()
+                # Responses served by llm_cache are timed separately from real LLM calls
+                if isinstance(response, dict) and response.get('cached'):
+                    self.add_sample('llm_cache_hit', end - start)
+                else:
+                    self.add_sample('llm_call', end - start)
+                self.record_page_call(kwargs, start, end)
+        return timed_completion
+
+    def install(self):
+        """Time the LLM calls of all bots started after this (botex calls completion from botex.bot)"""
+        import botex.bot
+        # completion is a botex internal - check it's there, or the timing would silently do nothing
+        if not callable(getattr(botex.bot, 'completion', None)):
+            raise RuntimeError(
+                "botex.bot.completion not found - LLM timing needs the botex version pinned in requirements.txt"
+            )
+        botex.bot.completion = self.wrap_completion(botex.bot.completion)
+
+    def record_page_call(self, kwargs, start, end):
+        # The first call of each bot is the "do you understand" prompt, which has no page
+        response_format = kwargs.get('response_format')
+        if getattr(response_format, '__name__', '') == 'StartSchema':
+            return
+
+        messages = kwargs.get('messages') or []
+        content = messages[-1].get('content', '') if messages else ''
+        match = ROUND_PATTERN.search(content)
+        round_number = int(match.group(1)) if match else None
+
+        # botex runs every bot in its own thread, so the thread tells us which bot made the call
+        with self.lock:
+            self.page_calls.setdefault(threading.current_thread().name, []).append(
+                (start, end, round_number)
+            )
+
+    def round_times(self):
+        """Per bot and round, the time from the first LLM call about that round to the first call about the next"""
+        durations = []
+        for calls in self.page_calls.values():
+            first_seen = {}
+            last_end = None
+            for start, end, round_number in sorted(calls):
+                if round_number is not None:
+                    first_seen.setdefault(round_number, start)
+                last_end = end
+            rounds = sorted(first_seen)
+            for i, round_number in enumerate(rounds):
+                round_end = first_seen[rounds[i + 1]] if i + 1 < len(rounds) else last_end
+                durations.append(round_end - first_seen[round_number])
+        return durations
+
+    def add_bot_timings(self, botex_participants, otree_participants):
+        """Time to first page and run time for each bot
+
+        botex_participants: rows of the botex participants table (time_in/time_out are set by the bot)
+        otree_participants: the normalized oTree 'participant' rows (time_started_utc is the first page load)
+        """
+        first_page = {
+            row['participant_code']: parse_utc(row.get('time_started_utc'))
+            for row in otree_participants
+        }
+        for row in botex_participants:
+            if row.get('is_human'):
+                continue
+            code = row['participant_id']
+            time_in = parse_utc(row.get('time_in'))
+            time_out = parse_utc(row.get('time_out'))
+            timings = {}
+            if time_in and first_page.get(code):
+                timings['time_to_first_page'] = (first_page[code] - time_in).total_seconds()
+                self.add_sample('time_to_first_page', timings['time_to_first_page'])
+            if time_in and time_out:
+                timings['bot_run_time'] = (time_out - time_in).total_seconds()
+                self.add_sample('bot_run_time', timings['bot_run_time'])
+            self.per_bot[code] = timings
+
+    def report(self, **info):
+        """Everything recorded so far as a JSON-serializable dict"""
+        metrics = {metric: describe(values) for metric, values in self.samples.items()}
+        metrics['round_time'] = describe(self.round_times())
+        return dict(
+            info,
+            total_seconds=time.perf_counter() - self.started,
+            steps=dict(self.steps),
+            metrics=metrics,
+            per_bot=self.per_bot,
+        )
+
+    def write_json(self, path, **info):
+        report = self.report(**info)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def summary_lines(self, report):
+        """Human-readable timing breakdown for the experiment summary file"""
+        total = report['total_seconds']
+        lines = [f"Total run time: {total:.2f}s", "", "Steps:"]
+        for name, seconds in report['steps'].items():
+            share = 100 * seconds / total if total else 0
+            lines.append(f"  {name:<22}{seconds:>10.2f}s {share:>6.1f}%")
+
+        header = f"  {'metric':<22}{'count':>6}{'mean':>9}" + ''.join(
+            f"{f'p{pct}':>9}" for pct in PERCENTILES
+        ) + f"{'max':>9}"
+        lines += ["", "Distributions (seconds):", header]
+        for name, stats in report['metrics'].items():
+            if not stats['count']:
+                lines.append(f"  {name:<22}{0:>6}")
+                continue
+            lines.append(
+                f"  {name:<22}{stats['count']:>6}{stats['mean']:>9.2f}"
+                + ''.join(f"{stats[f'p{pct}']:>9.2f}" for pct in PERCENTILES)
+                + f"{stats['max']:>9.2f}"
+            )
+        return lines
@@ -6,20 +6,76 @@ A simple oTree experiment where players compete in estimating a randomly generat
 
 from otree.api import *
 import random
-import botex
 import time
+from scoring import TIMEOUT_SCORE, rank_order, round_score
+from .params import MAX_ROUNDS, get_params, set_params
+from .lobby import lobby
+from .unit_of_work import UnitOfWork
+from .bots import is_bot
 
 # Constants - varaibles that stay the same throughout the experiment
+# Group size, number of rounds and guess time are set per session in settings.py (see params.py)
 class C(BaseConstants):
     NAME_IN_URL = 'game'
-    PLAYERS_PER_GROUP = 3
-    NUM_ROUNDS = 3
-    GUESS_TIME_SECONDS = 10
+    PLAYERS_PER_GROUP = None  # Groups are formed in Subsession.group_by_arrival_time_method
+    NUM_ROUNDS = MAX_ROUNDS  # Rounds after the session's num_rounds are skipped
+    STATUS_BROADCAST_WINDOW_SECONDS = 0.5  # Coalesce "k of N submitted" messages sent within this window
+
+# Live submission status - one entry per group (keyed by group.id) for the round in progress
+# We keep the set of players who have submitted, and when the group was last sent a status
+# message and with which count
+submission_status = {}
+
+def get_submission_status(group):
+    status = submission_status.get(group.id)
+    if status is None:
+        # Seed from the database, e.g. if the server restarted in the middle of a round
+        status = dict(
+            submitted={p.id_in_group for p in group.get_players() if p.has_submitted},
+            last_broadcast=0.0,
+            broadcast_count=0,
+        )
+        submission_status[group.id] = status
+    return status
+
+def record_submission(player):
+    """Add the player to their group's submitted set and return how many have submitted"""
+    status = get_submission_status(player.group)
+    status['submitted'].add(player.id_in_group)
+    num_submitted = len(status['submitted'])
+
+    # Everyone is in, so the round is over for this group and we can forget about it
+    if num_submitted >= get_params(player.session).players_per_group:
+        submission_status.pop(player.group.id, None)
+
+    return num_submitted
+
+def should_broadcast_status(group):
+    """True if the group hasn't been sent the latest count and its last status message is a window old
+    
+    A count held back within a window is carried by the next submission's message, or by the
+    results message when the round is complete
+    """
+    status = get_submission_status(group)
+    num_submitted = len(status['submitted'])
+    now = time.time()
+    if num_submitted == status['broadcast_count']:
+        return False
+    if now - status['last_broadcast'] < C.STATUS_BROADCAST_WINDOW_SECONDS:
+        return False
+    status['last_broadcast'] = now
+    status['broadcast_count'] = num_submitted
+    return True
 
 # Subsession class - we don't have any variables, but we define a method to create groups 
 # i.e., Subsession - for all groups in the session
 class Subsession(BaseSubsession):
     def creating_session(self):
+        # Validate the session config once and freeze the game parameters for this session
+        if self.round_number == 1:
+            params = set_params(self.session)
+        else:
+            params = get_params(self.session)
 
         # Create groups randomly in round 1
         if self.round_number == 1:
@@ -27,12 +83,28 @@ class Subsession(BaseSubsession):
         else:
             # Keep the groups the same across rounds
             self.group_like_round(1)
+        
+        # Rounds beyond the session's number of rounds are never played
+        if self.round_number > params.num_rounds:
+            return
             
         # Generate a target number for each group in this round
         for group in self.get_groups():
             group.target_number = random.randint(0, 100)
             print(f"ROUND {self.round_number}, TARGET: {group.target_number}")
 
+    # Form a group as soon as enough players are waiting on WaitForGroup
+    def group_by_arrival_time_method(self, waiting_players):
+        players_per_group = get_params(self.session).players_per_group
+        if len(waiting_players) >= players_per_group:
+            group_players = waiting_players[:players_per_group]
+
+            # These players are leaving the lobby, so stop counting them as waiting
+            for p in group_players:
+                lobby.remove(p.participant.code)
+
+            return group_players
+
 # Group - for all players in a group
 # We simply have one variable here - the target number which is the same for all members of the group
 class Group(BaseGroup):
@@ -68,165 +140,134 @@ class Player(BasePlayer):
             return 'Your guess must be between 0 and 100.'
     
     # Method to calculate the score for current rounds and across rounds
-    def calculate_score(self):
-        # Use field_maybe_none to safely access potentially null target number
-        target = self.group.field_maybe_none('target_number')
+    # All reads and writes go through the unit of work (see unit_of_work.py)
+    def calculate_score(self, uow):
+        # The target number may have been generated earlier in this submission, so read it from uow
+        target = uow.get(self.group, 'target_number')
         
         # If target is None, generate a random one
         if target is None:
             target = random.randint(0, 100)
-            self.group.target_number = target
+            uow.set(self.group, 'target_number', target)
             print(f"ROUND {self.round_number}, TARGET: {target} (generated)")
         
-        # Calculate score - safely check guess using field_maybe_none
-        guess = self.field_maybe_none('guess')
-        if guess is not None:
-            self.score = abs(guess - target)
-        else:
-            # If no guess was made, explicitly set to 100
-            self.score = 100
+        # Calculate score - the guess may be None
+        # If no guess was made, this is the timeout score of 100
+        score = round_score(uow.get(self, 'guess'), target)
+        uow.set(self, 'score', score)
             
-        print(f"  Score for this round: {self.score}")
+        print(f"  Score for this round: {score}")
         
         # Update total score by explicitly summing all rounds
-        self.total_score = sum(self.in_round(r).score for r in range(1, self.round_number + 1))
+        uow.set(self, 'total_score', self.sum_round_scores(uow))
         
         # Always set name from participant if available
+        name = uow.get(self, 'name')
         if hasattr(self.participant, 'name') and self.participant.name:
-            self.name = self.participant.name
-        elif not self.name or self.name.strip() == "":
-            self.name = f"Player {self.id_in_group}"
+            uow.set(self, 'name', self.participant.name)
+        elif not name or name.strip() == "":
+            uow.set(self, 'name', f"Player {self.id_in_group}")
         
         # Ensure name consistency across rounds - copy name to all rounds
         if self.round_number > 1:
-            prev_player = self.in_round(self.round_number - 1)
-            if prev_player.name and prev_player.name.strip() != "":
-                self.name = prev_player.name
+            prev_name = uow.get(uow.in_round(self, self.round_number - 1), 'name')
+            if prev_name and prev_name.strip() != "":
+                uow.set(self, 'name', prev_name)
         
-        return self.score
+        return score
+    
+    # Total score is always the sum of the round scores, never accumulated
+    def sum_round_scores(self, uow):
+        return sum(uow.get(p, 'score') for p in uow.in_all_rounds(self))
     
     # Method to catch any missing scores just in case
-    def ensure_all_rounds_scored(self):
+    def ensure_all_rounds_scored(self, uow):
         """Ensure all rounds up to the current round have scores properly set"""
-        for r in range(1, self.round_number + 1):
-            round_player = self.in_round(r)
+        for round_player in uow.in_all_rounds(self):
+            name = uow.get(round_player, 'name')
 
-            if not round_player.has_submitted:
+            if not uow.get(round_player, 'has_submitted'):
                 # If player didn't submit in this round, mark as timeout
-                round_player.has_submitted = True
-                round_player.computer_guess = True
-                round_player.guess = None
-                round_player.score = 100
-                print(f"Fixing missing score for {round_player.name} in round {r}: set to 100")
-
-            elif round_player.has_submitted and round_player.score == 0:
-                # For safety, check the guess value using field_maybe_none
-                guess = round_player.field_maybe_none('guess')
+                uow.set(round_player, 'has_submitted', True)
+                uow.set(round_player, 'computer_guess', True)
+                uow.set(round_player, 'guess', None)
+                uow.set(round_player, 'score', TIMEOUT_SCORE)
+                print(f"Fixing missing score for {name} in round {round_player.round_number}: set to 100")
 
-                if guess is None:
-                    # If player is marked as submitted but score is 0 and guess is None (timeout)
-                    round_player.score = 100
-                    round_player.computer_guess = True
-                    print(f"Fixing incorrect score for {round_player.name} in round {r}: set to 100")
+            elif uow.get(round_player, 'score') == 0 and uow.get(round_player, 'guess') is None:
+                # If player is marked as submitted but score is 0 and guess is None (timeout)
+                uow.set(round_player, 'score', TIMEOUT_SCORE)
+                uow.set(round_player, 'computer_guess', True)
+                print(f"Fixing incorrect score for {name} in round {round_player.round_number}: set to 100")
                 
         # Recalculate total score
-        self.total_score = sum(self.in_round(r).score for r in range(1, self.round_number + 1))
+        uow.set(self, 'total_score', self.sum_round_scores(uow))
         
     # Method to calculate the rankings for all players in the group
     # We also ensure that all players have valid names and scores
-    def calculate_rankings_for_group(self):
+    def calculate_rankings_for_group(self, uow):
         """Calculate rankings for all players in the group"""
-        players = self.group.get_players()
+        players = uow.group_players(self.group)
         
         # Make sure all players have valid names and scores
         for p in players:
             # Ensure name consistency
             if self.round_number > 1:
-                prev_player = p.in_round(1)
-                if prev_player.name and prev_player.name.strip() != "":
-                    p.name = prev_player.name
+                first_name = uow.get(uow.in_round(p, 1), 'name')
+                if first_name and first_name.strip() != "":
+                    uow.set(p, 'name', first_name)
             
-            if not p.name or p.name.strip() == "":
-                p.name = f"Player {p.id_in_group}"
+            name = uow.get(p, 'name')
+            if not name or name.strip() == "":
+                uow.set(p, 'name', f"Player {p.id_in_group}")
             
             # Ensure all rounds are properly scored for this player
-            p.ensure_all_rounds_scored()
+            p.ensure_all_rounds_scored(uow)
             
             # Ensure all players have their scores calculated for the current round
-            guess = p.field_maybe_none('guess')
-            if p.has_submitted and p.score == 0 and guess is not None:
-                p.calculate_score()
-            elif not p.has_submitted:
-                # Handle any players who somehow haven't been marked as submitted
-                p.has_submitted = True  # Mark as submitted
-                p.computer_guess = True  # Mark as a computer guess
-                p.guess = None  # Leave guess as None for timed-out players
-                p.score = 100  # Directly set score to 100
-                
-                print(f"Player {p.id_in_group} ({p.name}): No submission, setting score to 100")
+            # (ensure_all_rounds_scored has already marked players who never submitted as timeouts)
+            if uow.get(p, 'score') == 0 and uow.get(p, 'guess') is not None:
+                p.calculate_score(uow)
             
             # Explicitly recalculate total score for all players by summing all rounds
-            p.total_score = sum(p.in_round(r).score for r in range(1, p.round_number + 1))
-            print(f"Updated total score for {p.name}: {p.total_score}")
+            uow.set(p, 'total_score', p.sum_round_scores(uow))
+            print(f"Updated total score for {uow.get(p, 'name')}: {uow.get(p, 'total_score')}")
         
-        # Sort players by score (lower is better)
-        sorted_players = sorted(players, key=lambda p: p.score)
+        # Assign ranks by score (lower is better)
+        for p, rank in zip(players, rank_order([uow.get(p, 'score') for p in players])):
+            uow.set(p, 'rank', rank)
         
-        # Assign ranks
         print(f"\nROUND {self.round_number} SCORES:")
-        for i, p in enumerate(sorted_players):
-            p.rank = i + 1
-            print(f"  {p.name}: {p.score} (rank {p.rank})")
+        for p in sorted(players, key=lambda p: uow.get(p, 'rank')):
+            print(f"  {uow.get(p, 'name')}: {uow.get(p, 'score')} (rank {uow.get(p, 'rank')})")
         
         # If this is the final round, calculate final rankings
-        if self.round_number == C.NUM_ROUNDS:
-            # Ensure all rounds for all players are properly scored
-            for p in players:
-                for r in range(1, C.NUM_ROUNDS + 1):
-                    round_player = p.in_round(r)
-                    if not round_player.has_submitted:
-                        round_player.has_submitted = True
-                        round_player.computer_guess = True
-                        round_player.guess = None
-                        round_player.score = 100
-                        print(f"Final fixing for {round_player.name} in round {r}: set to 100")
-                    elif round_player.has_submitted and round_player.score == 0:
-                        # Check guess value safely
-                        guess = round_player.field_maybe_none('guess')
-                        if guess is None:
-                            round_player.score = 100
-                            round_player.computer_guess = True
-                            print(f"Final fixing score for {round_player.name} in round {r}: set to 100")
-                
-                # Calculate total score across all rounds
-                p.total_score = sum(p.in_round(r).score for r in range(1, C.NUM_ROUNDS + 1))
-                print(f"Final calculation - {p.name}: Total score {p.total_score}")
+        # All rounds of all players were checked by ensure_all_rounds_scored above
+        if self.round_number == get_params(self.session).num_rounds:
+            # Assign final ranks by total score across all rounds (lower is better)
+            for p, final_rank in zip(players, rank_order([uow.get(p, 'total_score') for p in players])):
+                uow.set(p, 'final_rank', final_rank)
             
-            # Sort by total score across all rounds (lower is better)
-            sorted_by_total = sorted(players, key=lambda p: p.total_score)
-            
-            # Assign final ranks
             print(f"\nFINAL RANKINGS:")
-            for i, p in enumerate(sorted_by_total):
-                p.final_rank = i + 1
-                print(f"  Position {p.final_rank}: {p.name} - {p.total_score} points")
+            for p in sorted(players, key=lambda p: uow.get(p, 'final_rank')):
+                print(f"  Position {uow.get(p, 'final_rank')}: {uow.get(p, 'name')} - {uow.get(p, 'total_score')} points")
 
     # Method to get formatted results data for the current round
-    def get_results_data(self):
+    def get_results_data(self, uow):
         """Get formatted results data for the current round"""
-        players = self.group.get_players()
         players_data = []
         
-        for p in players:
+        for p in uow.group_players(self.group):
             # Make sure name is never None or empty
-            player_name = p.name if p.name and p.name.strip() != "" else f"Player {p.id_in_group}"
+            name = uow.get(p, 'name')
+            player_name = name if name and name.strip() != "" else f"Player {p.id_in_group}"
             
             players_data.append({
                 'id': p.id_in_group,
                 'name': player_name,
-                'guess': p.field_maybe_none('guess'),  # Safely access guess
-                'score': p.score,
-                'rank': p.rank,
+                'guess': uow.get(p, 'guess'),
+                'score': uow.get(p, 'score'),
+                'rank': uow.get(p, 'rank'),
             })
         
         # Sort by rank
@@ -234,10 +275,10 @@ class Player(BasePlayer):
         
         # Return data which 
         return {
-            'target_number': self.group.target_number,
+            'target_number': uow.get(self.group, 'target_number'),
             'players_data': players_data,
             'round_number': self.round_number,
-            'total_rounds': C.NUM_ROUNDS,
+            'total_rounds': get_params(self.session).num_rounds,
         }
 
 # PAGES
@@ -252,19 +293,13 @@ class WaitForGroup(WaitPage):
         session = self.session
         current_time = time.time()
         
-        # Record the player's refresh time
-        self.participant.vars['last_refresh_time'] = current_time
+        # Record the player's refresh time (in memory, see lobby.py)
+        lobby.beat(self.participant.code, session.code, current_time)
         
         # Count only participants who have refreshed in the last 7 seconds
-        # Why 7? https://www.youtube.com/watch?v=T5a2OQuIZn0
-        waiting_participants = len([
-            p for p in session.get_participants()
-            if (p._current_page_name == 'WaitForGroup' and 
-                p._current_app_name == 'game' and
-                current_time - p.vars.get('last_refresh_time', 0) < 7)
-        ])
-        
-        group_size = C.PLAYERS_PER_GROUP
+        waiting_participants = lobby.count(session.code, current_time)
+        
+        group_size = get_params(session).players_per_group
         players_needed = max(0, group_size - waiting_participants % group_size)
         if players_needed == group_size:
             players_needed = 0
@@ -278,148 +313,190 @@ class WaitForGroup(WaitPage):
 class Game(Page):
     form_model = 'player'
     form_fields = ['guess']
-    timeout_seconds = C.GUESS_TIME_SECONDS
     
     def live_method(player, data):
         # Handle live updates during the game
         if 'submitted_guess' in data:
+            # Collect this submission's writes and flush them together at the end
+            uow = UnitOfWork()
+            
             # Store the guess
-            player.guess = data['submitted_guess']
+            uow.set(player, 'guess', data['submitted_guess'])
 
             # Mark player as having submitted
-            player.has_submitted = True
+            uow.set(player, 'has_submitted', True)
             
-            print(f"Player {player.id_in_group} submitted guess via live method: {player.guess}")
+            print(f"Player {player.id_in_group} submitted guess via live method: {uow.get(player, 'guess')}")
             
             # Calculate score right away
-            player.calculate_score()
+            player.calculate_score(uow)
             
             # Check if all players have submitted
-            all_submitted = all(p.has_submitted for p in player.group.get_players())
+            num_submitted = record_submission(player)
+            players_per_group = get_params(player.session).players_per_group
             
-            if all_submitted:
+            if num_submitted >= players_per_group:
                 # Calculate rankings for the group
-                player.calculate_rankings_for_group()
+                player.calculate_rankings_for_group(uow)
                 
                 # Get result data for all players
-                results_data = player.get_results_data()
+                results_data = player.get_results_data(uow)
+                uow.flush()
                 
                 # Return results to all players
                 return {0: {'phase': 'results', 'results': results_data}}
             else:
-                # Confirm submission to the submitting player only
-                return {player.id_in_group: {'phase': 'waiting', 'guess': player.guess}}
+                uow.flush()
+                status_data = {'submitted': num_submitted, 'total': players_per_group}
+                
+                if should_broadcast_status(player.group):
+                    # Tell the whole group how many players have submitted so far
+                    return {0: dict(status_data, phase='status')}
+                else:
+                    # Burst of submissions - confirm to the submitting player only, the group gets
+                    # the new count with the next live event after the window
+                    return {player.id_in_group: dict(status_data, phase='waiting', guess=player.guess)}
+
+        elif 'status' in data:
+            # Pages that have submitted ask for the count every few seconds, in case the last
+            # count of a burst was held back or the others submit through the form or a timeout
+            # (which can't send live messages). Only the in-memory status is read - if there is
+            # none, the round is over or nobody has submitted since the server started.
+            status = submission_status.get(player.group.id)
+            if status is not None and should_broadcast_status(player.group):
+                players_per_group = get_params(player.session).players_per_group
+                return {0: {'phase': 'status', 'submitted': len(status['submitted']), 'total': players_per_group}}
     
     def before_next_page(player, timeout_happened):
+        # Collect this page submission's writes and flush them together at the end
+        uow = UnitOfWork()
+        
         # This handles standard form submission (used by bots)
-        if not player.has_submitted:
+        if not uow.get(player, 'has_submitted'):
             # If guess was submitted via form
-            if player.guess is not None:
-                player.has_submitted = True
-                print(f"Player {player.id_in_group} submitted guess via form: {player.guess}")
+            if uow.get(player, 'guess') is not None:
+                uow.set(player, 'has_submitted', True)
+                print(f"Player {player.id_in_group} submitted guess via form: {uow.get(player, 'guess')}")
                 # Calculate score
-                player.calculate_score()
+                player.calculate_score(uow)
             # Handle timeout
             elif timeout_happened:
-                player.has_submitted = True
-                player.computer_guess = True
+                uow.set(player, 'has_submitted', True)
+                uow.set(player, 'computer_guess', True)
                 # Set a default guess of a random number between 1-100 for bots
                 # This prevents nulls in the database
-                import random
-                player.guess = random.randint(1, 100)
-                player.score = 100  # Set penalty score
-                print(f"Player {player.id_in_group} timeout, assigned random guess: {player.guess}, score set to 100")
+                uow.set(player, 'guess', random.randint(1, 100))
+                uow.set(player, 'score', TIMEOUT_SCORE)  # Set penalty score
+                print(f"Player {player.id_in_group} timeout, assigned random guess: {uow.get(player, 'guess')}, score set to 100")
+
+            # Count form submissions and timeouts towards the group's live status too
+            if uow.get(player, 'has_submitted'):
+                record_submission(player)
 
         # Make sure name is set correctly and consistently
+        name = uow.get(player, 'name')
         if hasattr(player.participant, 'name') and player.participant.name:
-            player.name = player.participant.name
-        elif not player.name or player.name.strip() == "":
-            player.name = f"Player {player.id_in_group}"
+            uow.set(player, 'name', player.participant.name)
+        elif not name or name.strip() == "":
+            uow.set(player, 'name', f"Player {player.id_in_group}")
         
         # If this is not round 1, ensure name consistency with previous rounds
         if player.round_number > 1:
-            prev_player = player.in_round(player.round_number - 1)
-            if prev_player.name and prev_player.name.strip() != "":
-                player.name = prev_player.name
+            prev_name = uow.get(uow.in_round(player, player.round_number - 1), 'name')
+            if prev_name and prev_name.strip() != "":
+                uow.set(player, 'name', prev_name)
         
         # Ensure all previous rounds are properly scored
-        player.ensure_all_rounds_scored()
+        player.ensure_all_rounds_scored(uow)
         
         # Now calculate rankings after all players have their scores
         # Only do this calculation once per group per round
-        if all(p.has_submitted for p in player.group.get_players()) and any(p.rank == 0 for p in player.group.get_players()):
-            player.calculate_rankings_for_group()
+        players = uow.group_players(player.group)
+        if all(uow.get(p, 'has_submitted') for p in players) and any(uow.get(p, 'rank') == 0 for p in players):
+            player.calculate_rankings_for_group(uow)
+        
+        uow.flush()
     
-    # Added to help bots process the page better
+
+    # Display the page in every round that this session plays
     def is_displayed(player):
-        # Always display the page
-        return True
+        return player.round_number <= get_params(player.session).num_rounds
     
     # Ensure we have data needed for the template
     def vars_for_template(self):
+        params = get_params(self.session)
         return {
-            'GUESS_TIME_SECONDS': C.GUESS_TIME_SECONDS,
+            'GUESS_TIME_SECONDS': params.guess_time_seconds,
             'round_number': self.round_number,
-            'total_rounds': C.NUM_ROUNDS,
+            'total_rounds': params.num_rounds,
         }
         
     # This ensures bots don't have to wait for timeouts
     def get_timeout_seconds(player):
         # For bots, reduce timeout to speed up the experiment
-        from botex.utils import is_bot
         if is_bot(player.participant.code):
             return 10  # Short timeout for bots
         else:
-            return C.GUESS_TIME_SECONDS
+            return get_params(player.session).guess_time_seconds
 
 class Results(Page):
     def is_displayed(self):
         # Only display on the final round
-        return self.round_number == C.NUM_ROUNDS
+        return self.round_number == get_params(self.session).num_rounds
+    
+    # Skip the unplayed rounds up to MAX_ROUNDS and go straight to the next app, if there is one
+    # (when the game is the last app, oTree can't skip ahead, but those rounds display no pages)
+    def app_after_this_page(self, upcoming_apps):
+        if upcoming_apps:
+            return upcoming_apps[0]
     
     def vars_for_template(self):
-        players = self.group.get_players()
+        # Collect the fixes below and flush them together before building the table
+        uow = UnitOfWork()
+        players = uow.group_players(self.group)
         
         # Force recalculation of final rankings
         # First, ensure all players in all rounds have proper scores
+        # (Results is only shown in the final round, so a player's rounds are all the session's rounds)
         for p in players:
-            for r in range(1, C.NUM_ROUNDS + 1):
-                round_player = p.in_round(r)
+            for round_player in uow.in_all_rounds(p):
+                r = round_player.round_number
                 # Ensure name consistency
                 if r > 1:
-                    prev_player = p.in_round(1)
-                    if prev_player.name and prev_player.name.strip() != "":
-                        round_player.name = prev_player.name
+                    first_name = uow.get(uow.in_round(p, 1), 'name')
+                    if first_name and first_name.strip() != "":
+                        uow.set(round_player, 'name', first_name)
                 
-                if not round_player.name or round_player.name.strip() == "":
-                    round_player.name = f"Player {round_player.id_in_group}"
+                name = uow.get(round_player, 'name')
+                if not name or name.strip() == "":
+                    uow.set(round_player, 'name', f"Player {round_player.id_in_group}")
+                name = uow.get(round_player, 'name')
                 
                 # Check if player has a valid score for this round
-                if not round_player.has_submitted:
+                if not uow.get(round_player, 'has_submitted'):
                     # Player never submitted in this round
-                    round_player.has_submitted = True
-                    round_player.computer_guess = True
-                    round_player.guess = None
-                    round_player.score = 100
-                    print(f"Results fixing: {round_player.name} in round {r} never submitted. Set score to 100")
-                elif round_player.has_submitted and round_player.score == 0:
-                    # Check guess using field_maybe_none
-                    guess = round_player.field_maybe_none('guess')
-                    if guess is None:
-                        # Player timed out but score wasn't set correctly
-                        round_player.score = 100
-                        round_player.computer_guess = True
-                        print(f"Results fixing: {round_player.name} in round {r} timed out but score was 0. Set to 100")
+                    uow.set(round_player, 'has_submitted', True)
+                    uow.set(round_player, 'computer_guess', True)
+                    uow.set(round_player, 'guess', None)
+                    uow.set(round_player, 'score', TIMEOUT_SCORE)
+                    print(f"Results fixing: {name} in round {r} never submitted. Set score to 100")
+                elif uow.get(round_player, 'score') == 0 and uow.get(round_player, 'guess') is None:
+                    # Player timed out but score wasn't set correctly
+                    uow.set(round_player, 'score', TIMEOUT_SCORE)
+                    uow.set(round_player, 'computer_guess', True)
+                    print(f"Results fixing: {name} in round {r} timed out but score was 0. Set to 100")
             
             # Explicitly recalculate total score from all rounds
-            round_scores = [p.in_round(r).score for r in range(1, C.NUM_ROUNDS + 1)]
-            p.total_score = sum(round_scores)
-            print(f"Results page - {p.name}: Round scores {round_scores}, Total: {p.total_score}")
+            round_scores = [uow.get(round_player, 'score') for round_player in uow.in_all_rounds(p)]
+            uow.set(p, 'total_score', sum(round_scores))
+            print(f"Results page - {uow.get(p, 'name')}: Round scores {round_scores}, Total: {sum(round_scores)}")
         
         # Recalculate final rankings
-        sorted_by_total = sorted(players, key=lambda p: p.total_score)
-        for i, p in enumerate(sorted_by_total):
-            p.final_rank = i + 1
+        for p, final_rank in zip(players, rank_order([uow.get(p, 'total_score') for p in players])):
+            uow.set(p, 'final_rank', final_rank)
+        uow.flush()
+        
+        for p in sorted(players, key=lambda p: p.final_rank):
             print(f"Final rank for {p.name}: {p.final_rank} with total score {p.total_score}")
         
         players_data = []
@@ -0,0 +1,70 @@
+# Bot detection without importing botex
+# Importing botex also imports LiteLLM, which takes seconds and fetches model prices over the
+# network, and the game app used to pay for that on every server start just to tell bots
+# from humans. botex records every participant it creates in its SQLite database (BOTEX_DB)
+# with an is_human flag, so we look the participant up there instead.
+# run_botex_experiment.py sets BOTEX_DB for the oTree server it starts. Without it (e.g. when
+# the server is started by hand for a botex session) every participant counts as human, so bots
+# get the human page timeouts - a warning is logged once when that happens.
+
+import logging
+import os
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# How long to wait for botex to release a write lock - the lookup runs inside oTree's async
+# server, so it must not block. If the database is locked we use what we read last time.
+LOCK_TIMEOUT_SECONDS = 0.05
+
+# Participant code -> True for bots, False for humans, from the last read of the botex database
+known_participants = {}
+# Path and modification time of the botex database when it was last read
+last_read = None
+# Whether the warning about a missing or unreadable botex database was logged already
+warned = False
+
+
+def read_participants(botex_db):
+    conn = sqlite3.connect(botex_db, timeout=LOCK_TIMEOUT_SECONDS)
+    try:
+        rows = conn.execute("SELECT participant_id, is_human FROM participants").fetchall()
+    finally:
+        conn.close()
+    return {participant_code: not is_human for participant_code, is_human in rows}
+
+
+def warn_once(message):
+    global warned
+    if not warned:
+        logger.warning(f"{message} - treating every participant as human. "
+                       "Set BOTEX_DB to the botex database if bots are playing (see env_template.txt)")
+        warned = True
+
+
+def is_bot(participant_code):
+    """True if botex created this participant as a bot"""
+    global known_participants, last_read
+
+    botex_db = os.environ.get('BOTEX_DB')
+    if not botex_db:
+        warn_once("BOTEX_DB is not set")
+        return False
+    try:
+        version = (botex_db, os.stat(botex_db).st_mtime_ns)
+    except OSError:
+        warn_once(f"The botex database {botex_db} (BOTEX_DB) does not exist")
+        return False
+
+    # Read all participants at once, and again only when botex has written to the database,
+    # so humans and bots alike are answered from memory
+    if version != last_read:
+        try:
+            known_participants = read_participants(botex_db)
+            last_read = version
+        except sqlite3.Error as e:
+            # e.g. botex holds a write lock or hasn't created its tables yet - try again next time
+            if last_read is None:
+                warn_once(f"The botex database {botex_db} (BOTEX_DB) could not be read ({e})")
+
+    return known_participants.get(participant_code, False)
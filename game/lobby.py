@@ -0,0 +1,62 @@
+# Lobby heartbeats for the WaitForGroup page
+# Every refresh of the waiting page records a heartbeat for the participant. These only matter
+# for a few seconds, so they are kept in memory rather than in participant.vars (which would
+# write the participant row on every refresh). Entries expire after HEARTBEAT_TTL_SECONDS and
+# the tracker never holds more than MAX_ENTRIES, so memory stays fixed however many
+# participants come and go during a long recruitment window.
+
+from collections import OrderedDict
+import time
+
+# Count only participants who have refreshed in the last 7 seconds
+# Why 7? https://www.youtube.com/watch?v=T5a2OQuIZn0
+HEARTBEAT_TTL_SECONDS = 7
+MAX_ENTRIES = 10000
+
+
+class HeartbeatTracker:
+    def __init__(self, ttl_seconds=HEARTBEAT_TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Participant code -> (session code, time of last refresh), oldest refresh first
+        self.entries = OrderedDict()
+        # Session code -> number of live entries, so counting doesn't scan the lobby
+        self.counts = {}
+
+    def beat(self, participant_code, session_code, now=None):
+        """Record a refresh of the waiting page"""
+        if now is None:
+            now = time.time()
+        self.remove(participant_code)
+        self.entries[participant_code] = (session_code, now)
+        self.counts[session_code] = self.counts.get(session_code, 0) + 1
+        self.prune(now)
+
+    def remove(self, participant_code):
+        entry = self.entries.pop(participant_code, None)
+        if entry is not None:
+            session_code = entry[0]
+            self.counts[session_code] -= 1
+            if not self.counts[session_code]:
+                del self.counts[session_code]
+
+    def prune(self, now=None):
+        """Drop expired entries, and the oldest ones if the tracker is over its size limit"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.ttl_seconds
+        # Entries are in refresh order, so all the expired ones are at the front
+        while self.entries:
+            participant_code, (_, last_refresh) = next(iter(self.entries.items()))
+            if last_refresh > cutoff and len(self.entries) <= self.max_entries:
+                break
+            self.remove(participant_code)
+
+    def count(self, session_code, now=None):
+        """Number of participants in the session who refreshed the waiting page within the TTL"""
+        self.prune(now)
+        return self.counts.get(session_code, 0)
+
+
+# One tracker for the server process, shared by all sessions
+lobby = HeartbeatTracker()
@@ -0,0 +1,67 @@
+# Game parameters that can change from one session to the next
+# They are read from the session config (see SESSION_CONFIGS in settings.py),
+# validated once when the session is created and then frozen, so that the
+# pages and live method never have to go back to the config dicts
+
+from dataclasses import dataclass
+import os
+
+# Values used when a session config doesn't set them
+DEFAULTS = dict(
+    players_per_group=3,
+    num_rounds=3,
+    guess_time_seconds=10,
+)
+
+# Upper bound on num_rounds - oTree needs a fixed number of rounds per app,
+# so the game app is built with this many and skips the rounds it doesn't need.
+# Every session still creates player and group rows for all of them, so keep it close to the
+# largest num_rounds in SESSION_CONFIGS. Read once at import: set GAME_MAX_ROUNDS (environment
+# or .env) before starting the server to allow more rounds.
+MAX_ROUNDS = int(os.environ.get('GAME_MAX_ROUNDS', 5))
+
+
+@dataclass(frozen=True)
+class GameParams:
+    players_per_group: int
+    num_rounds: int
+    guess_time_seconds: int
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the parameters from a session config, raising ValueError if any are invalid"""
+        values = {}
+        for key, default in DEFAULTS.items():
+            value = config.get(key, default)
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"Session config '{key}' must be a whole number, got {value!r}")
+            values[key] = value
+
+        if values['players_per_group'] < 1:
+            raise ValueError("Session config 'players_per_group' must be at least 1")
+        if not 1 <= values['num_rounds'] <= MAX_ROUNDS:
+            raise ValueError(f"Session config 'num_rounds' must be between 1 and {MAX_ROUNDS}")
+        if values['guess_time_seconds'] < 1:
+            raise ValueError("Session config 'guess_time_seconds' must be at least 1")
+
+        return cls(**values)
+
+
+# Frozen parameters for each session, keyed by session code
+session_params = {}
+
+
+def set_params(session):
+    """Validate the session config and freeze its parameters - called when the session is created"""
+    params = GameParams.from_config(session.config)
+    session_params[session.code] = params
+    return params
+
+
+def get_params(session):
+    """Get the frozen parameters for a session"""
+    params = session_params.get(session.code)
+    if params is None:
+        # e.g. the server restarted after the session was created
+        params = set_params(session)
+    return params
@@ -0,0 +1,52 @@
+# Unit of work for one submission
+# A single submission can change guess, has_submitted, score, total_score, name and rank for
+# the whole group, across several methods. Writing those straight to the models meant every
+# later query (in_round, get_players, ...) first sent the pending UPDATEs because of
+# SQLAlchemy's autoflush, so one submission became many small round-trips to the database -
+# fine on SQLite, but slow on Postgres where each one goes over the network.
+# Instead, the game reads and writes fields through a UnitOfWork. Rows are loaded once and
+# cached, writes are only recorded, and flush() sets the fields that actually changed at the
+# end of live_method/before_next_page. oTree then writes them all in one flush when it commits
+# the request.
+
+
+class UnitOfWork:
+    def __init__(self):
+        # id(model) -> (model, {field: new value})
+        self.changes = {}
+        # id(group) -> players in the group
+        self.players = {}
+        # id(player) -> the same participant's players in rounds 1 to player.round_number
+        self.rounds = {}
+
+    def get(self, obj, field):
+        """Value of a field including changes not flushed yet (None if the field is empty)"""
+        _, fields = self.changes.get(id(obj), (obj, {}))
+        if field in fields:
+            return fields[field]
+        return obj.field_maybe_none(field)
+
+    def set(self, obj, field, value):
+        self.changes.setdefault(id(obj), (obj, {}))[1][field] = value
+
+    def group_players(self, group):
+        if id(group) not in self.players:
+            self.players[id(group)] = group.get_players()
+        return self.players[id(group)]
+
+    def in_all_rounds(self, player):
+        """Like player.in_all_rounds(), but queried only once per unit of work"""
+        if id(player) not in self.rounds:
+            self.rounds[id(player)] = player.in_all_rounds()
+        return self.rounds[id(player)]
+
+    def in_round(self, player, round_number):
+        return self.in_all_rounds(player)[round_number - 1]
+
+    def flush(self):
+        """Set the changed fields on the models, to be written in one go when the request commits"""
+        for obj, fields in self.changes.values():
+            for field, value in fields.items():
+                if obj.field_maybe_none(field) != value:
+                    setattr(obj, field, value)
+        self.changes.clear()
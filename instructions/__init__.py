@@ -1,5 +1,5 @@
 from otree.api import *
-from game import C as GameC
+from game import get_params
 
 class C(BaseConstants):
     NAME_IN_URL = 'instructions'
@@ -30,10 +30,11 @@ class Name(Page):
 
 class Instructions(Page):
     def vars_for_template(self):
+        params = get_params(self.session)
         return {
-            'NUM_ROUNDS': GameC.NUM_ROUNDS,
-            'PLAYERS_PER_GROUP': GameC.PLAYERS_PER_GROUP,
-            'GUESS_TIME_SECONDS': GameC.GUESS_TIME_SECONDS
+            'NUM_ROUNDS': params.num_rounds,
+            'PLAYERS_PER_GROUP': params.players_per_group,
+            'GUESS_TIME_SECONDS': params.guess_time_seconds
         }
 
 page_sequence = [Name, Instructions]
\ No newline at end of file
@@ -0,0 +1,175 @@
+# Persistent cache of LLM responses for botex bots (used by run_botex_experiment.py)
+# Every bot starts with the same "do you understand" prompt, whatever the session. Responses
+# to it are stored in a local SQLite database and reused, keyed by model, normalized prompt
+# text and a hash of the conversation so far.
+# By default only the start prompt is cached. The page prompts that follow are not the same
+# across sessions even for static pages: after the Name page, each prompt carries the bot's
+# own answers (its chosen name and page summaries), so their keys never repeat.
+# Pages can still be cached by passing page_markers or cache_all_pages=True.
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+# Text that identifies pages whose prompt (and so a good response) never changes
+# Empty by default, see above. Don't add the Name page (instructions/Name.html): its answer is
+# the bot's chosen name, and a cached one would give every bot in every session the same name.
+DETERMINISTIC_PAGE_MARKERS = ()
+
+
+def normalize(text):
+    """Collapse whitespace so that layout differences in the scraped text don't change the key"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def is_valid_response(response):
+    """Only keep complete responses that contain JSON, so botex never gets a bad answer twice"""
+    resp_str = response.get('resp_str') or ''
+    if response.get('finish_reason') == 'length':
+        return False
+    start = resp_str.find('{')
+    end = resp_str.rfind('}')
+    if start == -1 or end < start:
+        return False
+    try:
+        json.loads(resp_str[start:end + 1], strict=False)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+class ResponseCache:
+    def __init__(self, db_path, max_entries=10000, max_age_seconds=30 * 24 * 3600,
+                 page_markers=DETERMINISTIC_PAGE_MARKERS, cache_all_pages=False):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.page_markers = page_markers
+        self.cache_all_pages = cache_all_pages
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.puts = 0
+        self.lock = threading.Lock()
+
+        with self.connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, model TEXT, response TEXT,
+                    created REAL, last_used REAL)
+                """
+            )
+        self.evict()
+
+    def connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def make_key(self, model, messages):
+        """Hash of the model, the normalized page text and the conversation state before it"""
+        state = [(m.get('role'), normalize(m.get('content'))) for m in messages[:-1]]
+        state_hash = hashlib.sha256(json.dumps(state).encode()).hexdigest()
+        page_text = normalize(messages[-1].get('content')) if messages else ''
+        return hashlib.sha256(
+            json.dumps([model, page_text, state_hash]).encode()
+        ).hexdigest()
+
+    def is_cacheable(self, messages, response_format):
+        if self.cache_all_pages:
+            return True
+        # The start prompt doesn't depend on the experiment at all
+        if getattr(response_format, '__name__', '') == 'StartSchema':
+            return True
+        content = messages[-1].get('content', '') if messages else ''
+        return any(marker in content for marker in self.page_markers)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock, self.connect() as conn:
+            row = conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.max_age_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self.lock, self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(response), now, now)
+            )
+            self.puts += 1
+            evict_now = self.puts % 100 == 0
+
+        # Keep the cache bounded while a long run keeps adding entries
+        if evict_now:
+            self.evict()
+
+    def evict(self):
+        """Drop entries older than max_age_seconds, then the least recently used beyond max_entries"""
+        with self.lock, self.connect() as conn:
+            conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.max_age_seconds,)
+            )
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key NOT IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)
+                """, (self.max_entries,)
+            )
+
+    def wrap_completion(self, completion):
+        """Wrap botex's completion function so that cacheable prompts are answered from the cache"""
+        def cached_completion(**kwargs):
+            messages = kwargs.get('messages') or []
+            if not messages or not self.is_cacheable(messages, kwargs.get('response_format')):
+                with self.lock:
+                    self.bypassed += 1
+                return completion(**kwargs)
+
+            model = kwargs.get('model')
+            key = self.make_key(model, messages)
+            response = self.get(key)
+            if response is not None:
+                with self.lock:
+                    self.hits += 1
+                return dict(response, cached=True)
+
+            with self.lock:
+                self.misses += 1
+            response = completion(**kwargs)
+            if is_valid_response(response):
+                self.put(key, model, {
+                    'resp_str': response['resp_str'],
+                    'finish_reason': response['finish_reason'],
+                })
+            return response
+        return cached_completion
+
+    def install(self):
+        """Use the cache for all bots started after this (botex calls completion from botex.bot)"""
+        import botex.bot
+        # completion is a botex internal - check it's there, or the caching would silently do nothing
+        if not callable(getattr(botex.bot, 'completion', None)):
+            raise RuntimeError(
+                "botex.bot.completion not found - LLM caching needs the botex version pinned in requirements.txt"
+            )
+        botex.bot.completion = self.wrap_completion(botex.bot.completion)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
@@ -0,0 +1,105 @@
+# Async client for the oTree REST API
+# Keeps one pool of keep-alive connections to the server, so creating and monitoring
+# many sessions doesn't pay for a new connection on every call (as the one-off
+# requests.get calls in botex do).
+# So far only test_localhost.py uses it. run_botex_experiment.py still goes through botex,
+# which has to create the sessions itself so that it can record the participants in its database.
+# Needs aiohttp (in requirements.txt).
+#
+# Example:
+#     async with OTreeClient("http://localhost:8000") as client:
+#         codes = await client.create_sessions('group_number_guess', num_participants=3, count=100)
+#         statuses = await client.participant_status_many(codes)
+
+import asyncio
+import os
+
+import aiohttp
+
+
+class OTreeClient:
+    def __init__(self, server_url=None, rest_key=None, max_connections=20, timeout_seconds=30):
+        # Same environment variables as botex
+        if server_url is None:
+            server_url = os.environ.get('OTREE_SERVER_URL', 'http://localhost:8000')
+        if rest_key is None:
+            rest_key = os.environ.get('OTREE_REST_KEY', '')
+
+        self.server_url = server_url.rstrip('/')
+        self.rest_key = rest_key
+        self.max_connections = max_connections
+        self.timeout_seconds = timeout_seconds
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            # At most max_connections requests are in flight, the rest wait for a free connection
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'otree-rest-key': self.rest_key},
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def call(self, method, *path_parts, **params):
+        """Call an oTree REST endpoint (e.g. call('GET', 'sessions', code)) and return the JSON response"""
+        await self.open()
+        url = f"{self.server_url}/api/{'/'.join(path_parts)}"
+        async with self.session.request(method, url, json=params or None) as resp:
+            if resp.status >= 400:
+                text = await resp.text()
+                raise Exception(f'Request to "{url}" failed with status code {resp.status}: {text}')
+            return await resp.json(content_type=None)
+
+    async def page_status(self, path='/'):
+        """HTTP status code of a (non-API) page on the server"""
+        await self.open()
+        async with self.session.get(self.server_url + path) as resp:
+            return resp.status
+
+    async def otree_version(self):
+        return await self.call('GET', 'otree_version')
+
+    async def session_configs(self):
+        return await self.call('GET', 'session_configs')
+
+    async def create_session(self, config_name, num_participants, room_name=None,
+                             modified_session_config_fields=None):
+        """Create a session and return its code"""
+        params = dict(session_config_name=config_name, num_participants=num_participants)
+        if room_name is not None:
+            params['room_name'] = room_name
+        if modified_session_config_fields is not None:
+            params['modified_session_config_fields'] = modified_session_config_fields
+        return (await self.call('POST', 'sessions', **params))['code']
+
+    async def get_session(self, code):
+        return await self.call('GET', 'sessions', code)
+
+    async def participant_status(self, code):
+        """The participants of a session, sorted by id_in_session"""
+        session = await self.get_session(code)
+        return sorted(session['participants'], key=lambda p: p['id_in_session'])
+
+    async def create_sessions(self, config_name, num_participants, count, **kwargs):
+        """Create count sessions concurrently and return their codes"""
+        return await asyncio.gather(*[
+            self.create_session(config_name, num_participants, **kwargs) for _ in range(count)
+        ])
+
+    async def participant_status_many(self, codes):
+        """Participant status for several sessions concurrently, keyed by session code"""
+        statuses = await asyncio.gather(*[self.participant_status(code) for code in codes])
+        return dict(zip(codes, statuses))
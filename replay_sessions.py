@@ -0,0 +1,259 @@
+# This script re-scores exported game data offline, without an oTree server.
+# It loads guesses and targets from oTree exports, re-applies the scoring, timeout and ranking
+# rules from scoring.py (the same code the live app uses) and reports every score, rank,
+# total score or final rank that doesn't match what was recorded.
+#
+# Run it from the project folder, e.g.
+#     python replay_sessions.py                       (all exports in data/ and botex_data/)
+#     python replay_sessions.py data/game_*.csv --json audit.json --workers 8
+#
+# Supported files:
+# - oTree per-app exports of the game app (data/game_<date>.csv)
+# - oTree all apps wide exports (data/all_apps_wide_<date>.csv)
+# - botex normalized exports (botex_data/session_<id>/otree_<id>_game_player.csv). These don't
+#   include the target number, so the recorded scores are checked for a target that explains them all
+
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from scoring import rank_order, round_score
+
+DEFAULT_PATTERNS = [
+    'data/game_*.csv',
+    'data/all_apps_wide_*.csv',
+    'botex_data/*/otree_*_game_player.csv',
+]
+
+APP_NAME = 'game'
+WIDE_COLUMN = re.compile(rf"^{APP_NAME}\.(\d+)\.(player|group|subsession)\.(\w+)$")
+
+
+def to_int(value):
+    if value is None or str(value).strip() == '':
+        return None
+    return int(float(value))
+
+
+def to_bool(value):
+    return str(value).strip().lower() in ('1', 'true')
+
+
+def make_record(session, round_number, group, fields):
+    """One player in one round, from the player/group fields of any of the export formats"""
+    return dict(
+        session=session,
+        round=round_number,
+        group=group,
+        id_in_group=to_int(fields.get('id_in_group')),
+        participant=fields.get('participant'),
+        guess=to_int(fields.get('guess')),
+        target=to_int(fields.get('target_number')),
+        computer_guess=to_bool(fields.get('computer_guess')),
+        has_submitted=to_bool(fields.get('has_submitted')),
+        score=to_int(fields.get('score')),
+        total_score=to_int(fields.get('total_score')),
+        rank=to_int(fields.get('rank')),
+        final_rank=to_int(fields.get('final_rank')),
+    )
+
+
+def load_records(path):
+    """Read an export file and return (format name, list of player-round records)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        return 'empty', []
+    columns = rows[0].keys()
+    records = []
+
+    if 'player.guess' in columns:
+        # Per-app export - one row per player and round
+        for row in rows:
+            fields = {key.split('.', 1)[1]: value for key, value in row.items() if key.startswith('player.')}
+            fields['target_number'] = row.get('group.target_number')
+            fields['participant'] = row['participant.code']
+            records.append(make_record(
+                row['session.code'], to_int(row['subsession.round_number']),
+                to_int(row['group.id_in_subsession']), fields
+            ))
+        return 'otree_app', records
+
+    if any(WIDE_COLUMN.match(column) for column in columns):
+        # All apps wide export - one row per participant with columns per round
+        for row in rows:
+            by_round = {}
+            for column, value in row.items():
+                match = WIDE_COLUMN.match(column or '')
+                if match:
+                    by_round.setdefault(int(match.group(1)), {})[f"{match.group(2)}.{match.group(3)}"] = value
+            for round_number, values in sorted(by_round.items()):
+                fields = {key.split('.', 1)[1]: value for key, value in values.items() if key.startswith('player.')}
+                fields['target_number'] = values.get('group.target_number')
+                fields['participant'] = row['participant.code']
+                records.append(make_record(
+                    row['session.code'], round_number, to_int(values.get('group.id_in_subsession')), fields
+                ))
+        return 'otree_wide', records
+
+    if 'participant_code' in columns and 'guess' in columns:
+        # botex normalized export - no session code or target number in the file, and the export
+        # can hold several sessions with the same group ids. Rows come in participant order, so a
+        # new group starts whenever an id_in_group repeats within the same round and group id.
+        session = os.path.basename(os.path.dirname(path)).replace('session_', '') or path
+        current = {}  # (round, group id) -> (group number, id_in_group values seen)
+        for row in rows:
+            key = (to_int(row['round']), to_int(row['group_id']))
+            number, seen = current.get(key, (0, set()))
+            if to_int(row['player_id']) in seen:
+                number, seen = number + 1, set()
+            seen.add(to_int(row['player_id']))
+            current[key] = (number, seen)
+
+            fields = dict(row, id_in_group=row['player_id'], participant=row['participant_code'])
+            group = f"{key[1]}#{number + 1}"
+            records.append(make_record(session, key[0], group, fields))
+        return 'botex', records
+
+    return 'unknown', []
+
+
+def possible_targets(rows):
+    """Targets between 0 and 100 that explain all recorded scores of a group in one round"""
+    return [
+        target for target in range(0, 101)
+        if all(
+            row['score'] == round_score(row['guess'], target, row['computer_guess'])
+            for row in rows
+        )
+    ]
+
+
+def replay_records(records):
+    """Re-score all records and return a list of mismatches with what was recorded"""
+    mismatches = []
+
+    def check(row, field, expected):
+        if row[field] != expected:
+            mismatches.append(dict(
+                session=row['session'], round=row['round'], group=row['group'],
+                participant=row['participant'], field=field,
+                recorded=row[field], expected=expected,
+            ))
+
+    groups = {}
+    for row in records:
+        groups.setdefault((row['session'], row['round'], row['group']), []).append(row)
+
+    # Rounds where nobody in the group submitted were never played (or were skipped)
+    played = {
+        key: sorted(rows, key=lambda row: row['id_in_group'])
+        for key, rows in groups.items()
+        if any(row['has_submitted'] for row in rows)
+    }
+    final_round = {}
+    for session, round_number, _ in played:
+        final_round[session] = max(final_round.get(session, 0), round_number)
+
+    # Round scores, ranks and running totals
+    scores = {}  # (session, participant) -> {round: score}
+    for (session, round_number, group), rows in sorted(played.items()):
+        target = next((row['target'] for row in rows if row['target'] is not None), None)
+        if target is not None:
+            expected_scores = [
+                round_score(row['guess'], target, row['computer_guess']) for row in rows
+            ]
+            for row, expected in zip(rows, expected_scores):
+                check(row, 'score', expected)
+        else:
+            # No target in the export - the recorded scores must at least agree on one
+            expected_scores = [row['score'] for row in rows]
+            if not possible_targets(rows):
+                for row in rows:
+                    check(row, 'score', 'consistent with a single target')
+
+        for row, rank in zip(rows, rank_order(expected_scores)):
+            check(row, 'rank', rank)
+
+        for row, score in zip(rows, expected_scores):
+            player_scores = scores.setdefault((session, row['participant']), {})
+            player_scores[round_number] = score
+            check(row, 'total_score', sum(
+                s for r, s in player_scores.items() if r <= round_number
+            ))
+
+    # Final ranks by total score in the last round
+    for (session, round_number, group), rows in sorted(played.items()):
+        if round_number != final_round[session]:
+            continue
+        totals = [sum(scores[(session, row['participant'])].values()) for row in rows]
+        for row, final_rank in zip(rows, rank_order(totals)):
+            check(row, 'final_rank', final_rank)
+
+    return dict(groups=len(played), mismatches=mismatches)
+
+
+def replay_file(path):
+    """Load one export file and replay it - runs in a worker process"""
+    try:
+        file_format, records = load_records(path)
+        result = replay_records(records)
+    except Exception as e:
+        return dict(path=path, error=str(e))
+    return dict(path=path, format=file_format, records=len(records), **result)
+
+
+def find_files(patterns):
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else []))
+    return list(dict.fromkeys(paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score exported game data and check it against the recorded scores")
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATTERNS, help="export files or glob patterns")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--json', help="write the full results, including every mismatch, to this file")
+    parser.add_argument('--show', type=int, default=5, help="mismatches to print per file")
+    args = parser.parse_args()
+
+    paths = find_files(args.paths)
+    if not paths:
+        print("No export files found")
+        return 1
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(replay_file, paths, chunksize=max(1, len(paths) // 64)))
+
+    total_mismatches = 0
+    for result in results:
+        if 'error' in result:
+            print(f"{result['path']}: ERROR {result['error']}")
+            continue
+        mismatches = result['mismatches']
+        total_mismatches += len(mismatches)
+        print(f"{result['path']} ({result['format']}): {result['records']} records, "
+              f"{result['groups']} group rounds, {len(mismatches)} mismatches")
+        for m in mismatches[:args.show]:
+            print(f"  session {m['session']} round {m['round']} group {m['group']} "
+                  f"participant {m['participant']}: {m['field']} recorded {m['recorded']}, expected {m['expected']}")
+        if len(mismatches) > args.show:
+            print(f"  ... and {len(mismatches) - args.show} more")
+
+    print(f"\n{len(results)} files, {total_mismatches} mismatches")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if total_mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,9 @@ import shutil
 import subprocess
 import sqlite3
 import glob
+import csv
+from experiment_timing import TimingRecorder
+from llm_cache import ResponseCache
 
 # Set up base output directory
 base_output_dir = "botex_data"
@@ -35,10 +38,24 @@ if os.path.exists('.env'):
     os.environ['OTREE_REST_KEY'] = environ.get('OTREE_REST_KEY', '')
     logger.info("Loaded environment variables from .env file")
 
+# Reuse LLM responses for the start prompt, which is the same in every session (see llm_cache.py).
+# Set LLM_CACHE_ALL_PAGES=1 (also in .env) to cache the responses for every page.
+llm_cache = ResponseCache(
+    path.join(base_output_dir, "llm_cache.sqlite3"),
+    cache_all_pages=environ.get('LLM_CACHE_ALL_PAGES') == '1'
+)
+llm_cache.install()
+
+# Record how long each step of the run takes and time every LLM call the bots make
+# (installed after the cache so that cache hits are timed separately)
+timing = TimingRecorder()
+timing.install()
+
 # Reset oTree database
 logger.info("Resetting oTree database...")
 try:
-    subprocess.run(["otree", "resetdb", "--noinput"], check=True)
+    with timing.step('reset_db'):
+        subprocess.run(["otree", "resetdb", "--noinput"], check=True)
     logger.info("oTree database reset successful")
 except subprocess.CalledProcessError as e:
     logger.error(f"Failed to reset oTree database: {e}")
@@ -56,32 +73,39 @@ if not LLM_API_KEY:
     print("Make sure to set this in your .env file")
     sys.exit(1)
 
+# Set up temporary database for session initialization
+# The game app looks up bots in this database (see game/bots.py), so the server needs its path
+temp_db = os.path.abspath(os.path.join(base_output_dir, "temp_botex.sqlite3"))
+if os.path.exists(temp_db):
+    os.remove(temp_db)
+os.environ['BOTEX_DB'] = temp_db
+
 # Start the oTree server
 otree_process = None
 try:
     # Start oTree server
     logger.info("Starting oTree server...")
-    otree_process = botex.start_otree_server(project_path=".")
+    with timing.step('server_startup'):
+        otree_process = botex.start_otree_server(project_path=".")
     
     # Get the available session configurations
     logger.info("Getting session configurations...")
-    session_configs = botex.get_session_configs(
-        otree_server_url="http://localhost:8000"
-    )
-    
-    # Set up temporary database for session initialization
-    temp_db = os.path.join(base_output_dir, "temp_botex.sqlite3")
-    if os.path.exists(temp_db):
-        os.remove(temp_db)
+    with timing.step('session_configs'):
+        session_configs = botex.get_session_configs(
+            otree_server_url="http://localhost:8000"
+        )
+    # The game app has a fixed number of rounds (GAME_MAX_ROUNDS), of which the session plays num_rounds
+    num_rounds = next(c for c in session_configs if c['name'] == 'group_number_guess')['num_rounds']
     
     # Initialize a session with the temporary database
     logger.info("Initializing oTree session...")
-    session = botex.init_otree_session(
-        config_name='group_number_guess',
-        npart=3,
-        otree_server_url="http://localhost:8000",
-        botex_db=temp_db
-    )
+    with timing.step('session_init'):
+        session = botex.init_otree_session(
+            config_name='group_number_guess',
+            npart=3,
+            otree_server_url="http://localhost:8000",
+            botex_db=temp_db
+        )
     
     session_id = session['session_id']
     logger.info(f"Session initialized with ID: {session_id}")
@@ -120,40 +144,53 @@ try:
     print(f"\nStarting bots. You can monitor their progress at {monitor_url}")
     
     # Run bots on the session with throttling only - no custom retry parameters
-    botex.run_bots_on_session(
-        session_id=session_id,
-        botex_db=botex_db,
-        model=LLM_MODEL,
-        api_key=LLM_API_KEY,
-        throttle=True  # Use throttling to avoid rate limits
-    )
+    with timing.step('bots'):
+        botex.run_bots_on_session(
+            session_id=session_id,
+            botex_db=botex_db,
+            model=LLM_MODEL,
+            api_key=LLM_API_KEY,
+            throttle=True  # Use throttling to avoid rate limits
+        )
     
     # Export oTree data
     logger.info("Exporting oTree data...")
-    botex.export_otree_data(
-        otree_wide_csv,
-        server_url="http://localhost:8000",
-        admin_name='admin',
-        admin_password=environ.get('OTREE_ADMIN_PASSWORD', 'admin')
-    )
+    with timing.step('export'):
+        botex.export_otree_data(
+            otree_wide_csv,
+            server_url="http://localhost:8000",
+            admin_name='admin',
+            admin_password=environ.get('OTREE_ADMIN_PASSWORD', 'admin')
+        )
     
     # Normalize and export to CSV
     logger.info("Normalizing oTree data...")
-    normalized_data = botex.normalize_otree_data(
-        otree_wide_csv, 
-        store_as_csv=True,
-        data_exp_path=output_dir,
-        exp_prefix=f"otree_{session_id}"
-    )
+    with timing.step('normalize'):
+        normalized_data = botex.normalize_otree_data(
+            otree_wide_csv, 
+            store_as_csv=True,
+            data_exp_path=output_dir,
+            exp_prefix=f"otree_{session_id}"
+        )
+    
+    # Bot time to first page and run time, from the botex database and the oTree participant data
+    try:
+        timing.add_bot_timings(
+            botex.read_participants_from_botex_db(session_id=session_id, botex_db=botex_db),
+            normalized_data.get('participant', [])
+        )
+    except Exception as e:
+        logger.warning(f"Could not compute bot timings: {str(e)}")
     
     # Try to export botex responses
     try:
         logger.info("Exporting botex response data...")
-        botex.export_response_data(
-            botex_responses_csv,
-            botex_db=botex_db,
-            session_id=session_id
-        )
+        with timing.step('response_export'):
+            botex.export_response_data(
+                botex_responses_csv,
+                botex_db=botex_db,
+                session_id=session_id
+            )
         logger.info("Bot responses successfully exported")
     except Exception as e:
         logger.warning(f"No bot responses could be exported: {str(e)}")
@@ -173,6 +210,33 @@ try:
         if not ("game_player" in filename or f"botex_{session_id}_responses" in filename):
             os.remove(csv_file)
             logger.info(f"Removed {filename}")
+        elif "game_player" in filename:
+            # Drop the rows of the rounds after num_rounds, which were skipped and are empty
+            with open(csv_file, newline='') as f:
+                reader = csv.DictReader(f)
+                fieldnames = reader.fieldnames
+                rows = [row for row in reader if int(row['round']) <= num_rounds]
+            with open(csv_file, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+            logger.info(f"Kept rounds 1 to {num_rounds} in {filename}")
+    
+    # LLM response cache hit rate
+    llm_cache_stats = llm_cache.stats()
+    logger.info(f"LLM response cache: {llm_cache_stats}")
+    
+    # Write the machine-readable timing report
+    timing_file = path.join(output_dir, f"timing_{session_id}.json")
+    timing_report = timing.write_json(
+        timing_file,
+        session_id=session_id,
+        model=LLM_MODEL,
+        num_participants=3,
+        created=datetime.datetime.now().isoformat(),
+        llm_cache=llm_cache_stats,
+    )
+    logger.info(f"Timing report: {timing_file}")
     
     # Create a summary file
     summary_file = path.join(output_dir, f"experiment_summary_{session_id}.txt")
@@ -185,6 +249,7 @@ try:
         f.write("Files generated:\n")
         f.write(f"- Log file: {path.basename(log_file)}\n")
         f.write(f"- Bot responses: {path.basename(botex_responses_csv)}\n")
+        f.write(f"- Timing report: {path.basename(timing_file)}\n")
         
         # Include the game player file
         game_player_files = [f for f in os.listdir(output_dir) if "game_player" in f]
@@ -193,6 +258,17 @@ try:
             for file in game_player_files:
                 f.write(f"- {file}\n")
         
+        # Add the LLM response cache hit rate
+        f.write("\nLLM Response Cache:\n")
+        f.write(f"- Hits: {llm_cache_stats['hits']}, misses: {llm_cache_stats['misses']}, not cacheable: {llm_cache_stats['bypassed']}\n")
+        if llm_cache_stats['hit_rate'] is not None:
+            f.write(f"- Hit rate: {100 * llm_cache_stats['hit_rate']:.1f}%\n")
+        
+        # Add the timing breakdown
+        f.write("\nTiming Breakdown:\n")
+        for line in timing.summary_lines(timing_report):
+            f.write(line + "\n")
+        
         # Add troubleshooting information
         f.write("\nTroubleshooting Notes:\n")
         f.write("- Make sure Game.html has a visible otree-btn-next element\n")
@@ -0,0 +1,22 @@
+# Scoring and ranking rules for the game
+# Kept outside the game package, and free of oTree, so that replay_sessions.py can re-score
+# exported data with exactly the same rules using only the standard library
+
+# Score for a round with no guess, or where the guess was made by the computer after a timeout
+TIMEOUT_SCORE = 100
+
+
+def round_score(guess, target, computer_guess=False):
+    """Score for one round - the distance between the guess and the target (lower is better)"""
+    if computer_guess or guess is None:
+        return TIMEOUT_SCORE
+    return abs(guess - target)
+
+
+def rank_order(scores):
+    """Ranks for a list of scores, lower is better and ties keep their order, e.g. [30, 10, 30] -> [2, 1, 3]"""
+    order = sorted(range(len(scores)), key=lambda i: scores[i])
+    ranks = [0] * len(scores)
+    for position, i in enumerate(order):
+        ranks[i] = position + 1
+    return ranks
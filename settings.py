@@ -31,12 +31,18 @@ ALLOWED_HOSTS = [
 
 # APPLICATION CONFIGURATION
 # ------------------------
+# Game parameters (players_per_group, num_rounds, guess_time_seconds) are set per session config,
+# so one server can run several conditions side by side - see game/params.py for the rules.
+# num_rounds can be at most GAME_MAX_ROUNDS (environment variable, default 5)
 SESSION_CONFIGS = [
     dict(
         name='group_number_guess',
         display_name="Group Number Guessing Game",
         app_sequence=['instructions', 'game'],
         num_demo_participants=3,
+        players_per_group=3,
+        num_rounds=3,
+        guess_time_seconds=10,
     ),
 ]
 
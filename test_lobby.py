@@ -0,0 +1,62 @@
+# Tests for the lobby heartbeats in game/lobby.py
+# Loaded from the file, since importing the game package would load oTree
+import importlib.util
+import os
+
+spec = importlib.util.spec_from_file_location(
+    'lobby', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'game', 'lobby.py')
+)
+lobby = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(lobby)
+
+
+def test_count_per_session():
+    tracker = lobby.HeartbeatTracker(ttl_seconds=7)
+    tracker.beat('p1', 's1', now=100)
+    tracker.beat('p2', 's1', now=101)
+    tracker.beat('p3', 's2', now=102)
+    assert tracker.count('s1', now=103) == 2
+    assert tracker.count('s2', now=103) == 1
+    assert tracker.count('s3', now=103) == 0
+
+
+def test_prune_drops_expired_entries():
+    tracker = lobby.HeartbeatTracker(ttl_seconds=7)
+    tracker.beat('p1', 's1', now=100)
+    tracker.beat('p2', 's1', now=105)
+    tracker.prune(now=107.5)
+    assert list(tracker.entries) == ['p2']
+    assert tracker.counts == {'s1': 1}
+    tracker.prune(now=113)
+    assert not tracker.entries
+    assert not tracker.counts
+
+
+def test_refresh_keeps_an_entry_alive():
+    tracker = lobby.HeartbeatTracker(ttl_seconds=7)
+    tracker.beat('p1', 's1', now=100)
+    tracker.beat('p2', 's1', now=101)
+    tracker.beat('p1', 's1', now=106)
+    assert tracker.count('s1', now=109) == 1
+    assert list(tracker.entries) == ['p1']
+
+
+def test_size_cap_evicts_oldest_entries():
+    tracker = lobby.HeartbeatTracker(ttl_seconds=7, max_entries=2)
+    tracker.beat('p1', 's1', now=100)
+    tracker.beat('p2', 's1', now=101)
+    tracker.beat('p3', 's2', now=102)
+    assert list(tracker.entries) == ['p2', 'p3']
+    assert tracker.counts == {'s1': 1, 's2': 1}
+
+
+def test_size_cap_undercounts_live_participants():
+    # p1 is still within the TTL, but the cap evicts it anyway, so it isn't counted until it
+    # refreshes again - MAX_ENTRIES has to stay well above the number of waiting participants
+    tracker = lobby.HeartbeatTracker(ttl_seconds=7, max_entries=2)
+    for i, code in enumerate(['p1', 'p2', 'p3']):
+        tracker.beat(code, 's1', now=100 + i)
+    assert tracker.count('s1', now=103) == 2
+    tracker.beat('p1', 's1', now=104)
+    assert tracker.count('s1', now=104) == 2
+    assert 'p2' not in tracker.entries
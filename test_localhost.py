@@ -1,27 +1,31 @@
 # test_connection.py
-import requests
+import asyncio
+from otree_client import OTreeClient
 
-def test_otree_connection():
+async def check_otree_connection():
     print("Testing oTree connection...")
+    # Try API endpoint with REST key
+    rest_key = 'otree_rest_F7Xu2pKm9bLz3vQd8TsAj5gW4eHnR6yE'
     try:
-        # Try basic connection
-        r = requests.get('http://localhost:8000')
-        print(f"Connection to main page: {'Success' if r.status_code == 200 else 'Failed'} (Status: {r.status_code})")
-        
-        # Try API endpoint with REST key
-        rest_key = 'otree_rest_F7Xu2pKm9bLz3vQd8TsAj5gW4eHnR6yE'
-        r_api = requests.get(
-            'http://localhost:8000/api/otree_version', 
-            headers={'otree-rest-key': rest_key}
-        )
-        print(f"Connection to API: {'Success' if r_api.status_code == 200 else 'Failed'} (Status: {r_api.status_code})")
-        if r_api.status_code == 200:
-            print(f"API Response: {r_api.json()}")
-        else:
-            print(f"API Error: {r_api.text}")
+        # Both checks share the client's connection pool
+        async with OTreeClient('http://localhost:8000', rest_key=rest_key) as client:
+            # Try basic connection
+            status = await client.page_status('/')
+            print(f"Connection to main page: {'Success' if status == 200 else 'Failed'} (Status: {status})")
+
+            try:
+                version = await client.otree_version()
+                print("Connection to API: Success")
+                print(f"API Response: {version}")
+            except Exception as e:
+                print("Connection to API: Failed")
+                print(f"API Error: {e}")
     except Exception as e:
         print(f"Exception: {e}")
 
+# Synchronous entry point, so that pytest can also run the check
+def test_otree_connection():
+    asyncio.run(check_otree_connection())
+
 if __name__ == "__main__":
     test_otree_connection()
-    
\ No newline at end of file
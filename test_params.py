@@ -0,0 +1,43 @@
+# Tests for validating session configs in game/params.py
+# Loaded from the file, since importing the game package would load oTree
+import importlib.util
+import os
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    'params', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'game', 'params.py')
+)
+params = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(params)
+
+
+def test_defaults():
+    assert params.GameParams.from_config({}) == params.GameParams(**params.DEFAULTS)
+
+
+def test_values_from_config():
+    p = params.GameParams.from_config(dict(players_per_group=2, num_rounds=1, guess_time_seconds=30))
+    assert (p.players_per_group, p.num_rounds, p.guess_time_seconds) == (2, 1, 30)
+
+
+@pytest.mark.parametrize('value', [True, False, '3', 3.0, None])
+def test_non_integer_values_are_rejected(value):
+    # bool is an int subclass, so True would otherwise pass as 1
+    with pytest.raises(ValueError, match='whole number'):
+        params.GameParams.from_config(dict(num_rounds=value))
+
+
+@pytest.mark.parametrize('config', [
+    dict(players_per_group=0),
+    dict(num_rounds=0),
+    dict(num_rounds=params.MAX_ROUNDS + 1),
+    dict(guess_time_seconds=0),
+])
+def test_out_of_range_values_are_rejected(config):
+    with pytest.raises(ValueError):
+        params.GameParams.from_config(config)
+
+
+def test_max_rounds_is_allowed():
+    assert params.GameParams.from_config(dict(num_rounds=params.MAX_ROUNDS)).num_rounds == params.MAX_ROUNDS
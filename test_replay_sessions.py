@@ -0,0 +1,58 @@
+# Tests for reading the botex normalized export in replay_sessions.py
+import csv
+
+from replay_sessions import load_records
+
+BOTEX_COLUMNS = ['participant_code', 'round', 'group_id', 'player_id', 'guess', 'score',
+                 'computer_guess', 'has_submitted', 'total_score', 'rank', 'final_rank']
+
+
+def write_botex_export(tmp_path, rows):
+    session_dir = tmp_path / 'session_abc123'
+    session_dir.mkdir()
+    path = session_dir / 'otree_abc123_game_player.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=BOTEX_COLUMNS)
+        writer.writeheader()
+        for participant, round_number, group_id, player_id, guess in rows:
+            writer.writerow(dict(participant_code=participant, round=round_number, group_id=group_id,
+                                 player_id=player_id, guess=guess, score=10, computer_guess=0,
+                                 has_submitted=1, total_score=10, rank=player_id, final_rank=''))
+    return str(path)
+
+
+def test_botex_export_is_recognized(tmp_path):
+    path = write_botex_export(tmp_path, [('p1', 1, 1, 1, 40), ('p2', 1, 1, 2, 60)])
+    fmt, records = load_records(path)
+    assert fmt == 'botex'
+    assert [r['participant'] for r in records] == ['p1', 'p2']
+    assert {r['session'] for r in records} == {'abc123'}
+    assert {r['group'] for r in records} == {'1#1'}
+    assert records[0]['guess'] == 40
+    assert records[0]['has_submitted'] is True
+
+
+def test_repeated_id_in_group_starts_a_new_group(tmp_path):
+    # Two sessions in one export, both with a group 1 - rows come in participant order
+    path = write_botex_export(tmp_path, [
+        ('a1', 1, 1, 1, 10), ('a2', 1, 1, 2, 20),
+        ('b1', 1, 1, 1, 30), ('b2', 1, 1, 2, 40),
+    ])
+    _, records = load_records(path)
+    assert [r['group'] for r in records] == ['1#1', '1#1', '1#2', '1#2']
+
+
+def test_groups_are_split_per_round(tmp_path):
+    # Each round counts its own repeats, so round 2 of the same group is group 1#1 again
+    path = write_botex_export(tmp_path, [
+        ('a1', 1, 1, 1, 10), ('a2', 1, 1, 2, 20),
+        ('a1', 2, 1, 1, 30), ('a2', 2, 1, 2, 40),
+    ])
+    _, records = load_records(path)
+    assert [(r['round'], r['group']) for r in records] == [(1, '1#1'), (1, '1#1'), (2, '1#1'), (2, '1#1')]
+
+
+def test_empty_export(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_text('')
+    assert load_records(str(path)) == ('empty', [])
@@ -0,0 +1,25 @@
+# Tests for the scoring rules shared by the game app and replay_sessions.py
+from scoring import TIMEOUT_SCORE, rank_order, round_score
+
+
+def test_round_score_is_distance_to_target():
+    assert round_score(40, 55) == 15
+    assert round_score(55, 40) == 15
+
+
+def test_round_score_timeout():
+    assert round_score(50, 50, computer_guess=True) == TIMEOUT_SCORE
+    assert round_score(None, 50) == TIMEOUT_SCORE
+
+
+def test_rank_order_lower_is_better():
+    assert rank_order([30, 10, 20]) == [3, 1, 2]
+
+
+def test_rank_order_ties_keep_their_order():
+    assert rank_order([30, 10, 30]) == [2, 1, 3]
+    assert rank_order([5, 5, 5]) == [1, 2, 3]
+
+
+def test_rank_order_empty():
+    assert rank_order([]) == []